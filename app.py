@@ -1,6 +1,10 @@
 from src import create_app
-# NEW: Import the utility function and the 'click' library for CLI commands
-from src.utils import enrich_book_data
+from src.assets import build_assets
+# NEW: Import the 'click' library for CLI commands. Enrichment is imported
+# inside its command, so web workers don't load requests and langdetect.
+import os
+import json
+import secrets
 import click
 
 # Create the Flask app using the application factory in the 'src' package.
@@ -13,11 +17,66 @@ def enrich_books_command():
     Reads books.json, enriches each book with data from the Google Books API,
     and overwrites the file.
     """
+    from src.utils import enrich_book_data
     click.echo("Starting book enrichment process...")
     enrich_book_data()
     click.echo("Book enrichment process finished.")
 
 
+@app.cli.command("build-assets")
+def build_assets_command():
+    """
+    Bundles and minifies the CSS and JS, writes content-hashed files with
+    precompressed .gz/.br siblings to static/dist, and reloads the manifest.
+    """
+    click.echo("Building static assets...")
+    app.asset_manifest = build_assets(app.static_folder)
+    click.echo(f"Built {len(app.asset_manifest)} assets.")
+
+
+@app.cli.command("create-election")
+@click.argument("election_id")
+@click.option("--books", "books_path", type=click.Path(exists=True), help="A books.json to start the election with.")
+@click.option("--admin-password", help="The election's admin password. A random one is generated if omitted.")
+def create_election_command(election_id, books_path, admin_password):
+    """
+    Creates data/elections/<election_id>/ so the election is served at
+    /e/<election_id>/, with its own admin password.
+    """
+    books = []
+    if books_path:
+        with open(books_path, 'r') as f:
+            books = json.load(f)
+    password = admin_password or secrets.token_urlsafe(12)
+    try:
+        app.election_registry.create(election_id, books=books, settings={'ADMIN_PASSWORD': password})
+    except (ValueError, OSError) as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Created election '{election_id}' with {len(books)} books.")
+    if not admin_password:
+        click.echo(f"Admin password: {password}")
+
+
+@app.cli.command("snapshot-books")
+def snapshot_books_command():
+    """
+    Precomputes the compact catalogue snapshot (data/books.snapshot, plus one
+    per election) that FAST_STARTUP loads instead of parsing books.json.
+    """
+    from src.books import BookStore
+    from src.elections import ELECTIONS_DIR
+
+    books_files = ['data/books.json']
+    if os.path.isdir(ELECTIONS_DIR):
+        books_files += [os.path.join(ELECTIONS_DIR, name, 'books.json') for name in sorted(os.listdir(ELECTIONS_DIR))]
+    for books_file in books_files:
+        if not os.path.isfile(books_file):
+            continue
+        store = BookStore(books_file)
+        if store.save_snapshot():
+            click.echo(f"Wrote {store.snapshot_file} ({len(store.books)} books).")
+
+
 # This block allows running the app directly with 'python app.py'
 if __name__ == "__main__":
     # The 'flask run' command will also find and run this 'app' object.
@@ -0,0 +1,48 @@
+import os
+import json
+import shutil
+import tempfile
+from src.books import BookStore
+from src.utils import cache_api_response
+from .common import best_of, synthetic_books, load_api_fixtures
+
+def run(sizes, repeat=5):
+    """
+    Benchmarks BookStore load (from JSON and from the snapshot), add,
+    delete and reorder on catalogues of each size. add_book is served from
+    a synthetic API response, so no network is used. Returns {name: ms}.
+    """
+    fixture = load_api_fixtures()[0]
+    cache_api_response(fixture['params'], fixture['response'])
+    # The query the fixture answers, split back into title and author.
+    title, author = fixture['params']['q'][len('intitle:'):].split('+inauthor:')
+
+    results = {}
+    tmp_dir = tempfile.mkdtemp(prefix='bookclub-bench-')
+    try:
+        for size in sizes:
+            books_file = os.path.join(tmp_dir, f'books_{size}.json')
+            with open(books_file, 'w') as f:
+                json.dump(synthetic_books(size), f, indent=4)
+            prefix = f"bookstore.n={size}"
+
+            results[f"{prefix}.load_ms"] = best_of(lambda: BookStore(books_file), repeat)
+            store = BookStore(books_file)
+            # FAST_STARTUP path: the first load writes the snapshot, later ones read it.
+            BookStore(books_file, use_snapshot=True)
+            results[f"{prefix}.load_snapshot_ms"] = best_of(lambda: BookStore(books_file, use_snapshot=True), repeat)
+
+            added_ids = []
+            def add():
+                book = store.add_book({"title": title, "author": author, "suggested_by": "Benchmark"})
+                added_ids.append(book.id)
+            results[f"{prefix}.add_book_ms"] = best_of(add, repeat)
+
+            results[f"{prefix}.delete_book_ms"] = best_of(lambda: store.delete_book(added_ids.pop()), repeat)
+
+            def reorder():
+                store.update_order([book.id for book in reversed(store.books)])
+            results[f"{prefix}.update_order_ms"] = best_of(reorder, repeat)
+    finally:
+        shutil.rmtree(tmp_dir)
+    return results
@@ -0,0 +1,39 @@
+import copy
+from langdetect import DetectorFactory
+from src.utils import (
+    cache_api_response, enrich_single_book, strip_tags,
+    is_promotional_text, is_supplementary_material, is_collection_or_box_set
+)
+from .common import best_of, load_api_fixtures
+
+def run(repeat=5):
+    """
+    Runs the enrichment filters and the full enrich_single_book pipeline
+    over synthetic Google Books API responses. Returns {name: ms}.
+    """
+    # langdetect is randomised; seed it so runs are comparable.
+    DetectorFactory.seed = 0
+
+    fixtures = load_api_fixtures()
+    volumes = [item.get('volumeInfo', {}) for fixture in fixtures for item in fixture['response'].get('items', [])]
+    books = []
+    for fixture in fixtures:
+        cache_api_response(fixture['params'], fixture['response'])
+        title, author = fixture['params']['q'][len('intitle:'):].split('+inauthor:')
+        books.append({"title": title, "author": author})
+
+    def run_filters():
+        for volume_info in volumes:
+            summary = strip_tags(volume_info.get('description', ''))
+            is_promotional_text(summary)
+            is_supplementary_material(volume_info, summary)
+            is_collection_or_box_set(volume_info)
+
+    def run_pipeline():
+        for book in books:
+            enrich_single_book(copy.deepcopy(book))
+
+    return {
+        f"enrichment.filters.volumes={len(volumes)}_ms": best_of(run_filters, repeat),
+        f"enrichment.enrich_single_book.books={len(books)}_ms": best_of(run_pipeline, repeat),
+    }
@@ -0,0 +1,42 @@
+from src.book import Book
+from src.voting import BallotStore, VOTING_SYSTEMS, get_voting_strategy
+from .common import best_of, synthetic_books, synthetic_votes
+
+NUM_BOOKS = 12
+POINTS_PER_VOTER = 5
+
+def run(sizes, repeat=5, systems=VOTING_SYSTEMS):
+    """
+    Benchmarks each voting strategy (all of them by default) on synthetic
+    elections of each size. Returns {name: ms}.
+    """
+    books = [Book(data) for data in synthetic_books(NUM_BOOKS)]
+    book_ids = [book.id for book in books]
+    results = {}
+
+    for system in systems:
+        for size in sizes:
+            votes = synthetic_votes(system, size, book_ids, POINTS_PER_VOTER)
+            prefix = f"voting.{system}.n={size}"
+
+            # record_vote: all `size` votes into a fresh store. The last
+            # store is kept for the tally benchmarks below.
+            def record_votes():
+                nonlocal store, strategy
+                store = BallotStore()
+                strategy = get_voting_strategy(system, POINTS_PER_VOTER, store)
+                for vote in votes:
+                    strategy.record_vote(vote)
+            store = strategy = None
+            results[f"{prefix}.record_votes_ms"] = best_of(record_votes, repeat)
+
+            # Tallies on a cold cache (a fresh strategy over the same ballots) ...
+            results[f"{prefix}.get_public_results_ms"] = best_of(
+                lambda: get_voting_strategy(system, POINTS_PER_VOTER, store).get_public_results(), repeat)
+            results[f"{prefix}.calculate_results_ms"] = best_of(
+                lambda: get_voting_strategy(system, POINTS_PER_VOTER, store).calculate_results(books), repeat)
+
+            # ... and on a warm one, which is what /results polling mostly hits.
+            strategy.get_public_results()
+            results[f"{prefix}.get_public_results_cached_ms"] = best_of(strategy.get_public_results, repeat)
+    return results
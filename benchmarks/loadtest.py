@@ -0,0 +1,115 @@
+import os
+import json
+import logging
+import time
+import threading
+import statistics
+import urllib.error
+import urllib.request
+from http.cookiejar import CookieJar
+from werkzeug.serving import make_server
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+def _request(opener, url, payload=None):
+    """Sends a request and returns (status, seconds)."""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, method='POST' if data else 'GET')
+    if data:
+        request.add_header('Content-Type', 'application/json')
+    start = time.perf_counter()
+    try:
+        with opener.open(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+def _make_ballot(system, book_ids, points_per_voter, i):
+    # Rotate preferences so every voter's ballot differs a little.
+    ranking = book_ids[i % len(book_ids):] + book_ids[:i % len(book_ids)]
+    if system == 'ranked_choice':
+        return {'ballot': ranking}
+    if system == 'cumulative':
+        return {'ballot': {ranking[0]: points_per_voter}}
+    return {'book_id': ranking[0]}
+
+def run(voters=200, concurrency=20, pollers=5):
+    """
+    Serves the app on a local threaded WSGI server, then has `voters`
+    simulated members (at most `concurrency` at once) load the vote page and
+    cast one ballot each while `pollers` clients poll /results.
+    Returns {name: value}; latencies are in ms, throughput in requests/s.
+    """
+    # Every simulated voter comes from 127.0.0.1, so admission control would
+    # (correctly) throttle them all as one IP. Raise the per-IP limits for the
+    # test; each voter's own bucket still applies. Allow every active voter a write slot.
+    os.environ.setdefault('VOTE_IP_RATE_PER_SECOND', '100000')
+    os.environ.setdefault('VOTE_IP_BURST', '100000')
+    os.environ.setdefault('MAX_CONCURRENT_VOTES', str(concurrency))
+    from src import create_app
+
+    app = create_app()
+    system = app.config.get('VOTING_SYSTEM', 'plurality')
+    points_per_voter = app.config.get('POINTS_PER_VOTER', 5)
+    book_ids = [book.id for book in app.book_store.books] or ['book_1']
+
+    # One access log line per request would drown out the report.
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies = {'vote_page': [], 'vote': [], 'results': []}
+    statuses = {}
+    lock = threading.Lock()
+    next_voter = iter(range(voters))
+    voting_done = threading.Event()
+
+    def record(kind, status, seconds):
+        with lock:
+            latencies[kind].append(seconds * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def voter_worker():
+        while True:
+            with lock:
+                i = next(next_voter, None)
+            if i is None:
+                return
+            # A new cookie jar per voter, so each one gets its own session.
+            opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+            record('vote_page', *_request(opener, f"{base_url}/vote"))
+            record('vote', *_request(opener, f"{base_url}/vote", _make_ballot(system, book_ids, points_per_voter, i)))
+
+    def poller_worker():
+        opener = urllib.request.build_opener()
+        while not voting_done.is_set():
+            record('results', *_request(opener, f"{base_url}/results"))
+
+    pollers_threads = [threading.Thread(target=poller_worker) for _ in range(pollers)]
+    voter_threads = [threading.Thread(target=voter_worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in pollers_threads + voter_threads:
+        thread.start()
+    for thread in voter_threads:
+        thread.join()
+    voting_done.set()
+    for thread in pollers_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    total_requests = sum(len(samples) for samples in latencies.values())
+    results = {"loadtest.throughput_rps": total_requests / elapsed}
+    for kind, samples in latencies.items():
+        results[f"loadtest.{kind}.p50_ms"] = _percentile(samples, 50)
+        results[f"loadtest.{kind}.p99_ms"] = _percentile(samples, 99)
+    results["loadtest.errors"] = sum(count for status, count in statuses.items() if status >= 400)
+    return results
@@ -20,4 +20,43 @@ class Config:
 
     # NEW: Add a toggle for showing the suggester's name
     # This will read from your .env file. It defaults to True if not set.
-    SHOW_SUGGESTER = os.environ.get('SHOW_SUGGESTER', 'True').lower() in ('true', '1', 't')
\ No newline at end of file
+    SHOW_SUGGESTER = os.environ.get('SHOW_SUGGESTER', 'True').lower() in ('true', '1', 't')
+
+    # NEW: Duplicate-vote protection
+    # Each voter (browser session, or voter code if VOTER_CODES is set) gets one ballot.
+    ONE_VOTE_PER_VOTER = os.environ.get('ONE_VOTE_PER_VOTER', 'True').lower() in ('true', '1', 't')
+    # Expected number of voters; sizes the in-memory duplicate filter.
+    VOTER_INDEX_CAPACITY = int(os.environ.get('VOTER_INDEX_CAPACITY', 100000))
+    # Optional list of per-election voter codes, normally set in settings.json.
+    VOTER_CODES = None
+
+    # NEW: Admission control for the vote endpoints
+    # Each client may vote VOTE_RATE_PER_SECOND times per second on average, with bursts up to VOTE_BURST.
+    VOTE_RATE_PER_SECOND = float(os.environ.get('VOTE_RATE_PER_SECOND', 1.0))
+    VOTE_BURST = int(os.environ.get('VOTE_BURST', 5))
+    # Every IP address is also limited, with room for a whole club voting from behind one NAT.
+    VOTE_IP_RATE_PER_SECOND = float(os.environ.get('VOTE_IP_RATE_PER_SECOND', 5.0))
+    VOTE_IP_BURST = int(os.environ.get('VOTE_IP_BURST', 50))
+    # Vote writes running at once; anything beyond this gets a 429.
+    MAX_CONCURRENT_VOTES = int(os.environ.get('MAX_CONCURRENT_VOTES', 8))
+    # Number of clients whose rate limits are tracked at once.
+    ADMISSION_MAX_CLIENTS = int(os.environ.get('ADMISSION_MAX_CLIENTS', 10000))
+    # Reverse proxies in front of the app. When set, the client IP is taken
+    # from X-Forwarded-For, so clients aren't all limited as the proxy's address.
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+
+    # NEW: Multi-election hosting
+    # Elections loaded into memory at once; the least recently used is saved and unloaded.
+    MAX_ACTIVE_ELECTIONS = int(os.environ.get('MAX_ACTIVE_ELECTIONS', 50))
+    # Elections idle for longer than this are saved and unloaded.
+    ELECTION_IDLE_SECONDS = int(os.environ.get('ELECTION_IDLE_SECONDS', 3600))
+
+    # NEW: Observability
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    # If set, /admin/metrics also accepts 'Authorization: Bearer <token>', for Prometheus scrapers.
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # NEW: Fast cold start
+    # Load the catalogue from the precomputed data/books.snapshot (see 'flask snapshot-books')
+    # instead of parsing books.json. A stale or missing snapshot falls back to books.json and is rebuilt.
+    FAST_STARTUP = os.environ.get('FAST_STARTUP', 'False').lower() in ('true', '1', 't')
\ No newline at end of file
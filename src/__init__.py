@@ -1,11 +1,23 @@
+import time
+# Measure how long the app's imports take, for the startup report.
+_import_start = time.perf_counter()
+
 import os
 import json
+import logging
 from flask import Flask
 from .books import BookStore
 from .voting_manager import VotingManager # Import the new class
+from .admission import AdmissionController
+from .log import configure_logging
+from .metrics import STARTUP_DURATION
+
+IMPORT_SECONDS = time.perf_counter() - _import_start
+logger = logging.getLogger(__name__)
 
 def create_app():
     """Create and configure an instance of the Flask application."""
+    start = time.perf_counter()
     # MODIFIED: Explicitly tell Flask where the static and template folders are located.
     # The paths are relative to the 'src' directory where this file lives.
     app = Flask(
@@ -17,15 +29,16 @@ def create_app():
     
     # Load default configuration from config.py
     app.config.from_object('config.Config')
+    configure_logging(app.config.get('LOG_LEVEL', 'INFO'))
 
     # Load dynamic settings from settings.json and override defaults
     try:
         with open('data/settings.json', 'r') as f:
             settings = json.load(f)
             app.config.update(settings)
-            print(f"Loaded VOTING_SYSTEM: {app.config.get('VOTING_SYSTEM')}")
+            logger.info("Loaded settings", extra={"voting_system": app.config.get('VOTING_SYSTEM')})
     except (FileNotFoundError, json.JSONDecodeError):
-        print("Warning: settings.json not found or invalid. Using default config.")
+        logger.warning("settings.json not found or invalid. Using default config.")
 
     # Ensure the instance folder exists
     try:
@@ -33,17 +46,61 @@ def create_app():
     except OSError:
         pass
 
-    # Initialize the BookStore
-    app.book_store = BookStore()
+    # Initialize the BookStore. With FAST_STARTUP, the catalogue comes from
+    # the precomputed snapshot instead of parsing books.json.
+    books_start = time.perf_counter()
+    app.book_store = BookStore(use_snapshot=app.config.get('FAST_STARTUP', False))
+    books_seconds = time.perf_counter() - books_start
 
     # Get config values to initialize the VotingManager
     strategy_name = app.config.get('VOTING_SYSTEM', 'plurality')
     points = app.config.get('POINTS_PER_VOTER', 5)
-    app.voting_manager = VotingManager(strategy_name, points)
+    voter_capacity = app.config.get('VOTER_INDEX_CAPACITY', 100000)
+    app.voting_manager = VotingManager(strategy_name, points, voter_capacity)
+
+    # Behind a reverse proxy, recover the real client address from X-Forwarded-For
+    trusted_proxies = app.config.get('TRUSTED_PROXIES', 0)
+    if trusted_proxies:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+
+    # Shed bursts of vote traffic before they pile up in the worker
+    app.admission_controller = AdmissionController(
+        rate=app.config.get('VOTE_RATE_PER_SECOND', 1.0),
+        burst=app.config.get('VOTE_BURST', 5),
+        ip_rate=app.config.get('VOTE_IP_RATE_PER_SECOND', 5.0),
+        ip_burst=app.config.get('VOTE_IP_BURST', 50),
+        max_concurrent=app.config.get('MAX_CONCURRENT_VOTES', 8),
+        max_clients=app.config.get('ADMISSION_MAX_CLIENTS', 10000)
+    )
 
     # Register blueprints
     from . import main, admin
     app.register_blueprint(main.main_bp)
     app.register_blueprint(admin.admin_bp)
 
+    # NEW: Serve each election under /e/<election_id> with its own state
+    from .elections import init_elections
+    init_elections(app, main.main_bp, admin.admin_bp)
+
+    # NEW: Request latency histograms and the /admin/metrics endpoint
+    from .metrics import init_metrics
+    init_metrics(app)
+
+    # Serve the fingerprinted static bundles (built by 'flask build-assets')
+    from .assets import init_assets
+    init_assets(app)
+
+    total_seconds = time.perf_counter() - start
+    STARTUP_DURATION.set(IMPORT_SECONDS, phase='imports')
+    STARTUP_DURATION.set(books_seconds, phase='load_books')
+    STARTUP_DURATION.set(total_seconds, phase='create_app')
+    logger.info("App created", extra={
+        "imports_ms": round(IMPORT_SECONDS * 1000, 1),
+        "load_books_ms": round(books_seconds * 1000, 1),
+        "create_app_ms": round(total_seconds * 1000, 1),
+        "books": len(app.book_store.books),
+        "fast_startup": bool(app.config.get('FAST_STARTUP', False)),
+    })
+
     return app
\ No newline at end of file
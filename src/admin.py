@@ -1,23 +1,46 @@
 import uuid
-import json # NEW: Import json
+import hmac
+import logging
 from functools import wraps
 from flask import (
-    Blueprint, render_template, request, session, redirect, url_for, flash, jsonify, current_app
+    Blueprint, render_template, request, session, redirect, flash, jsonify, current_app, Response, g
 )
+from .voting import VOTING_SYSTEMS
+from .elections import get_election, election_url
+from .metrics import render_metrics
+
+logger = logging.getLogger(__name__)
 
 # --- Blueprint Setup ---
 # The first argument is the blueprint's name.
 # The second is the import name, which is used to locate resources.
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin', template_folder='../templates')
 
-# --- Admin Authentication Decorator ---
+# --- Admin Authentication ---
+def _admin_key(election_id):
+    # The default election is stored as '' (the session is JSON).
+    return election_id or ''
+
+def is_election_admin(election_id=None):
+    """
+    Whether this session has logged in to the admin of the given election
+    (by default the current one). Admin rights are granted per election.
+    """
+    if election_id is None:
+        election_id = g.get('election_id')
+    return _admin_key(election_id) in session.get('admin_elections', [])
+
+@admin_bp.app_context_processor
+def inject_admin():
+    return {'is_admin': is_election_admin()}
+
 def admin_required(f):
     """Decorator to restrict access to admin-only routes."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not session.get('is_admin'):
+        if not is_election_admin():
             flash('You need to be an admin to access this page.', 'error')
-            return redirect(url_for('admin.login')) # Note: blueprint name prefix
+            return redirect(election_url('admin.login')) # Note: blueprint name prefix
         return f(*args, **kwargs)
     return decorated_function
 
@@ -26,27 +49,35 @@ def admin_required(f):
 @admin_bp.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
-        password = request.form.get('password')
-        # MODIFIED: Use the password from the app's configuration
-        if password == current_app.config['ADMIN_PASSWORD']:
-            session['is_admin'] = True
+        password = request.form.get('password') or ''
+        # MODIFIED: Each election has its own password (the default election's
+        # comes from the app config), and logging in only grants that election.
+        expected = get_election().config.get('ADMIN_PASSWORD')
+        if expected and hmac.compare_digest(password.encode('utf-8'), expected.encode('utf-8')):
+            key = _admin_key(g.get('election_id'))
+            if key not in session.get('admin_elections', []):
+                session['admin_elections'] = session.get('admin_elections', []) + [key]
             flash('Successfully logged in as admin.', 'success')
-            return redirect(url_for('admin.panel')) # Note: blueprint name prefix
+            return redirect(election_url('admin.admin_page')) # Note: blueprint name prefix
+        elif not expected:
+            flash('This election has no admin password set.', 'error')
         else:
             flash('Incorrect password.', 'error')
     return render_template('admin_login.html')
 
 @admin_bp.route('/logout')
 def logout():
-    session.pop('is_admin', None)
+    key = _admin_key(g.get('election_id'))
+    session['admin_elections'] = [k for k in session.get('admin_elections', []) if k != key]
     flash('You have been logged out.', 'info')
-    return redirect(url_for('main.landing')) # Note: blueprint name prefix for main app
+    return redirect(election_url('main.landing')) # Note: blueprint name prefix for main app
 
 @admin_bp.route('/')
 @admin_required
 def admin_page():
     """Renders the main admin panel."""
-    return render_template('admin.html', books=current_app.book_store.books)
+    election = get_election()
+    return render_template('admin.html', books=election.book_store.books, settings=election.config)
 
 @admin_bp.route('/add_book', methods=['POST'])
 @admin_required
@@ -71,14 +102,14 @@ def add_book():
         "author": author,
         "suggested_by": suggester
     }
-    new_book = current_app.book_store.add_book(new_book_data)
+    new_book = get_election().book_store.add_book(new_book_data)
     return jsonify(success=True, book=new_book.__dict__)
 
 @admin_bp.route('/delete_book/<string:book_id>', methods=['DELETE'])
 @admin_required
 def delete_book(book_id):
     """Deletes a book from the list."""
-    success = current_app.book_store.delete_book(book_id)
+    success = get_election().book_store.delete_book(book_id)
     if success:
         return jsonify(success=True, message="Book deleted successfully.")
     else:
@@ -93,7 +124,7 @@ def update_order():
     if not new_order:
         return jsonify(success=False, message="Missing order data."), 400
     
-    current_app.book_store.update_book_order(new_order)
+    get_election().book_store.update_order(new_order)
     return jsonify(success=True, message="Book order updated.")
 
 
@@ -101,10 +132,47 @@ def update_order():
 @admin_required
 def calculate_results():
     """Calculates and returns the winner based on the current voting system."""
-    books = current_app.book_store.books
-    results = current_app.voting_manager.calculate_results(books)
+    election = get_election()
+    results = election.voting_manager.calculate_results(election.book_store.books)
     return jsonify(results)
 
+@admin_bp.route('/compare_results')
+@admin_required
+def compare_results():
+    """Re-tallies the stored ballots under every voting system, side by side."""
+    election = get_election()
+    return jsonify(election.voting_manager.compare_results(election.book_store.books))
+
+@admin_bp.route('/reset_votes', methods=['POST'])
+@admin_required
+def reset_votes():
+    """Discards all ballots so a new election can start."""
+    get_election().voting_manager.reset_votes()
+    return jsonify(success=True, message="All votes have been reset.")
+
+@admin_bp.route('/voter_stats')
+@admin_required
+def voter_stats():
+    """Reports unique voters and how many duplicate ballots were rejected."""
+    return jsonify(get_election().voting_manager.get_voter_stats())
+
+@admin_bp.route('/admission_stats')
+@admin_required
+def admission_stats():
+    """Reports how many vote requests were accepted and how many were shed."""
+    return jsonify(current_app.admission_controller.get_stats())
+
+@admin_bp.route('/metrics')
+def metrics():
+    """Exposes the app's metrics in the Prometheus text format."""
+    token = current_app.config.get('METRICS_TOKEN')
+    auth_header = request.headers.get('Authorization', '')
+    has_token = bool(token) and hmac.compare_digest(auth_header, f"Bearer {token}")
+    # Metrics cover every election, so only the default election's admin may read them.
+    if not is_election_admin(election_id='') and not has_token:
+        return Response("Forbidden\n", status=403, mimetype='text/plain')
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 # NEW: Route to update the voting system setting
 @admin_bp.route('/update_settings', methods=['POST'])
 @admin_required
@@ -113,31 +181,21 @@ def update_settings():
     new_system = data.get('voting_system')
     points_per_voter = data.get('points_per_voter', 5)
 
-    if new_system not in ['ranked_choice', 'plurality', 'cumulative']:
+    if new_system not in VOTING_SYSTEMS:
         return jsonify(success=False, message="Invalid voting system specified."), 400
 
     try:
-        # Read the current settings
-        with open('data/settings.json', 'r') as f:
-            settings = json.load(f)
-        
         # Update the voting system and points
-        settings['VOTING_SYSTEM'] = new_system
+        settings = {'VOTING_SYSTEM': new_system}
         if new_system == 'cumulative':
             settings['POINTS_PER_VOTER'] = int(points_per_voter)
-        
-        # Write the new settings back to the file
-        with open('data/settings.json', 'w') as f:
-            json.dump(settings, f, indent=4)
-        
-        # Also update the config of the currently running app
-        current_app.config.update(settings)
-        
-        # CRITICAL FIX: Re-initialize the voting strategy in the voting_manager
-        current_app.voting_manager.set_voting_strategy()
+
+        # Write the election's settings file, update its running config and
+        # switch the voting strategy; stored ballots are kept and re-tallied
+        get_election().save_settings(settings)
 
         return jsonify(success=True, message="Settings updated successfully.")
 
     except (IOError, ValueError) as e:
-        print(f"Error updating settings: {e}")
+        logger.error("Error updating settings", extra={"error": str(e)})
         return jsonify(success=False, message="Could not save settings file."), 500
\ No newline at end of file
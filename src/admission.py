@@ -0,0 +1,115 @@
+import math
+import time
+import threading
+from collections import OrderedDict, Counter
+from functools import wraps
+from flask import current_app, request, session, jsonify
+
+class TokenBucket:
+    """Refills at `rate` tokens per second up to `burst` tokens."""
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst, now):
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, rate, burst, now) -> float:
+        """
+        Takes one token. Returns 0 on success, otherwise the number of
+        seconds until a token will be available.
+        """
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+class AdmissionController:
+    """
+    Sheds excess vote traffic before it reaches the voting manager.
+    Every request takes a token from its IP's bucket, sized for a club
+    behind one NAT, and then from its voter's own bucket (the least recently
+    seen buckets are dropped once `max_clients` is reached, bounding memory).
+    At most `max_concurrent` vote writes run at once.
+    """
+
+    def __init__(self, rate=1.0, burst=5, ip_rate=5.0, ip_burst=50, max_concurrent=8, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.counters = Counter(accepted=0, shed_rate_limited=0, shed_over_capacity=0)
+
+    def _take(self, key, rate, burst, now) -> float:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(burst, now)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket.take(rate, burst, now)
+
+    def check_rate(self, ip, voter_id=None) -> float:
+        """Returns 0 if the client may proceed, else the seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            # The IP bucket comes first, so a flood of fresh sessions from one
+            # address is stopped before it can create (and evict) voter buckets.
+            wait = self._take(f"ip:{ip}", self.ip_rate, self.ip_burst, now)
+            if not wait and voter_id:
+                wait = self._take(f"voter:{voter_id}", self.rate, self.burst, now)
+            if wait:
+                self.counters['shed_rate_limited'] += 1
+            return wait
+
+    def try_acquire(self) -> bool:
+        """Claims a write slot without waiting."""
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            self.counters['shed_over_capacity'] += 1
+        return False
+
+    def release(self):
+        self._slots.release()
+
+    def record_accepted(self):
+        with self._lock:
+            self.counters['accepted'] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats['tracked_clients'] = len(self.buckets)
+        return stats
+
+def too_many_requests(retry_after):
+    """Builds a 429 response with a Retry-After header (whole seconds)."""
+    response = jsonify(success=False, message="Too many votes right now. Please try again shortly.")
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+def admission_controlled(f):
+    """Decorator that rate-limits a route per client and caps its concurrency."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        controller = current_app.admission_controller
+        wait = controller.check_rate(request.remote_addr or 'unknown', session.get('voter_id'))
+        if wait:
+            return too_many_requests(wait)
+        if not controller.try_acquire():
+            return too_many_requests(1)
+        try:
+            controller.record_accepted()
+            return f(*args, **kwargs)
+        finally:
+            controller.release()
+    return decorated_function
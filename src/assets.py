@@ -0,0 +1,214 @@
+import os
+import re
+import json
+import gzip
+import logging
+import hashlib
+from flask import Blueprint, current_app, request, send_from_directory, url_for, abort
+
+# Brotli is optional. Without it, only .gz siblings are written.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# The entry points that get bundled. Each one is followed through its
+# CSS @import / JS import statements and written out as a single file.
+ASSET_ENTRY_POINTS = ['css/main.css', 'js/main.js', 'js/admin.js']
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'manifest.json'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Only names carrying a content hash (see fingerprint) are safe to cache forever.
+FINGERPRINTED_PATTERN = re.compile(r'\.[0-9a-f]{12}\.(?:css|js)\Z')
+
+CSS_IMPORT_PATTERN = re.compile(r"""@import\s+url\(\s*['"]?([^'")]+)['"]?\s*\)\s*;""")
+JS_IMPORT_PATTERN = re.compile(r"""^\s*import\s+.*?\s+from\s+['"](\.{1,2}/[^'"]+)['"]\s*;?\s*$""", re.MULTILINE)
+
+assets_bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+
+# --- Bundling and Minifying ---
+
+def minify_css(css: str) -> str:
+    """Strips comments and collapses whitespace in a CSS string."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+def minify_js(js: str) -> str:
+    """
+    Conservatively minifies a JS string: removes block comments, full-line
+    comments, indentation and blank lines. Code inside a line is left alone
+    so strings and regex literals are never touched.
+    """
+    js = re.sub(r'/\*.*?\*/', '', js, flags=re.DOTALL)
+    lines = []
+    for line in js.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        lines.append(stripped)
+    return '\n'.join(lines)
+
+def bundle_css(static_folder: str, path: str, seen=None) -> str:
+    """Inlines every @import of a CSS file, depth first."""
+    seen = seen if seen is not None else set()
+    if path in seen:
+        return ''
+    seen.add(path)
+
+    with open(os.path.join(static_folder, path), 'r') as f:
+        source = f.read()
+
+    def inline_import(match):
+        imported = os.path.normpath(os.path.join(os.path.dirname(path), match.group(1)))
+        return bundle_css(static_folder, imported, seen)
+
+    return CSS_IMPORT_PATTERN.sub(inline_import, source)
+
+def bundle_js(static_folder: str, path: str, seen=None) -> str:
+    """
+    Concatenates an ES module with its relative imports, dependencies first.
+    Import lines and 'export' keywords are dropped, so the bundle is one module.
+    """
+    seen = seen if seen is not None else set()
+    if path in seen:
+        return ''
+    seen.add(path)
+
+    with open(os.path.join(static_folder, path), 'r') as f:
+        source = f.read()
+
+    parts = []
+    for match in JS_IMPORT_PATTERN.finditer(source):
+        imported = os.path.normpath(os.path.join(os.path.dirname(path), match.group(1)))
+        parts.append(bundle_js(static_folder, imported, seen))
+
+    source = JS_IMPORT_PATTERN.sub('', source)
+    source = re.sub(r'^export\s+(?=(?:async\s+)?function|const|let|class)', '', source, flags=re.MULTILINE)
+    parts.append(source)
+    return '\n'.join(part for part in parts if part)
+
+def fingerprint(path: str, content: bytes) -> str:
+    """Returns 'css/main.<hash>.css' for 'css/main.css'."""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+def write_precompressed(file_path: str, content: bytes):
+    """Writes .gz (and .br, if brotli is installed) siblings of a file."""
+    with open(f"{file_path}.gz", 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f"{file_path}.br", 'wb') as f:
+            f.write(brotli.compress(content))
+
+def prune_dist(dist_folder: str, keep: set):
+    """Deletes files in static/dist that the latest build didn't write."""
+    for root, dirs, files in os.walk(dist_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, dist_folder).replace(os.sep, '/') not in keep:
+                os.remove(path)
+                logger.info("Removed stale asset", extra={"file": path})
+
+def build_assets(static_folder: str) -> dict:
+    """
+    Bundles, minifies and fingerprints every entry point into static/dist,
+    writes precompressed siblings and a manifest, and removes the outputs
+    of earlier builds. Returns the manifest.
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist_folder, exist_ok=True)
+
+    manifest = {}
+    for entry in ASSET_ENTRY_POINTS:
+        if entry.endswith('.css'):
+            content = minify_css(bundle_css(static_folder, entry))
+        else:
+            content = minify_js(bundle_js(static_folder, entry))
+
+        content_bytes = content.encode('utf-8')
+        hashed_name = fingerprint(entry, content_bytes)
+        output_path = os.path.join(dist_folder, hashed_name)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        with open(output_path, 'wb') as f:
+            f.write(content_bytes)
+        write_precompressed(output_path, content_bytes)
+
+        manifest[entry] = hashed_name
+        logger.info("Built asset", extra={
+            "entry": entry, "output": f"{DIST_DIR}/{hashed_name}", "bytes": len(content_bytes)
+        })
+
+    with open(os.path.join(dist_folder, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+    keep = {MANIFEST_FILE}
+    for hashed_name in manifest.values():
+        keep.update((hashed_name, f"{hashed_name}.gz", f"{hashed_name}.br"))
+    prune_dist(dist_folder, keep)
+
+    return manifest
+
+
+# --- Serving ---
+
+def load_manifest(static_folder: str) -> dict:
+    """Loads the asset manifest, or an empty dict if assets were never built."""
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def asset_url(filename: str) -> str:
+    """
+    Template helper: the URL of the fingerprinted build of a static file,
+    falling back to the raw static file when no build exists.
+    """
+    hashed_name = current_app.asset_manifest.get(filename)
+    if hashed_name:
+        return url_for('assets.serve_asset', filename=hashed_name)
+    return url_for('static', filename=filename)
+
+@assets_bp.route('/<path:filename>')
+def serve_asset(filename):
+    """Serves a fingerprinted asset, preferring a precompressed sibling."""
+    dist_folder = os.path.join(current_app.static_folder, DIST_DIR)
+    # The manifest and anything else without a content hash must not get the immutable headers.
+    if not FINGERPRINTED_PATTERN.search(filename) or not os.path.isfile(os.path.join(dist_folder, filename)):
+        abort(404)
+
+    # Werkzeug parses the header, so q=0 (and unlisted codings) count as refused.
+    accepted = request.accept_encodings
+    encoding = suffix = None
+    best_quality = 0
+    for candidate, candidate_suffix in (('br', '.br'), ('gzip', '.gz')):
+        quality = accepted[candidate]
+        if quality > best_quality and os.path.isfile(os.path.join(dist_folder, filename + candidate_suffix)):
+            encoding, suffix, best_quality = candidate, candidate_suffix, quality
+
+    if encoding:
+        response = send_from_directory(dist_folder, filename + suffix)
+        # Keep the content type of the original file, not of the archive.
+        response.mimetype = 'text/css' if filename.endswith('.css') else 'text/javascript'
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(dist_folder, filename)
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+def init_assets(app):
+    """Loads the manifest and registers the asset blueprint and template helper."""
+    app.asset_manifest = load_manifest(app.static_folder)
+    app.register_blueprint(assets_bp)
+    app.jinja_env.globals['asset_url'] = asset_url
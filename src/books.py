@@ -1,17 +1,33 @@
 import os
 import json
+import pickle
+import hashlib
+import logging
+import tempfile
 import uuid # NEW: Import uuid to generate unique IDs
 
-# MODIFIED: Import the correct enrichment function from your existing utils.py
 from .book import Book
 from .voting import get_voting_strategy
-from .utils import enrich_single_book
+from .metrics import BOOKS_FILE_DURATION, BOOKS_FILE_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Bump when Book's attributes change, so old snapshots are rebuilt.
+SNAPSHOT_VERSION = 1
+
+def snapshot_path(books_file: str) -> str:
+    """data/books.json -> data/books.snapshot"""
+    return os.path.splitext(books_file)[0] + '.snapshot'
 
 class BookStore:
     """A simple class to hold and manage the application's data."""
     # MODIFIED: Initialize with a default strategy
-    def __init__(self):
-        self.books_file = 'data/books.json'
+    def __init__(self, books_file='data/books.json', use_snapshot=False):
+        self.books_file = books_file
+        self.snapshot_file = snapshot_path(books_file)
+        self.use_snapshot = use_snapshot
+        # Hash stamp of the books.json content the books were loaded from.
+        self.source_stamp = None
         self.books = self.load_books() # Initialize and load books
         self._loaded = False
         self.voting_strategy = None # Will be set by the app factory
@@ -20,29 +36,118 @@ class BookStore:
         """Sets the voting strategy for the store."""
         self.voting_strategy = get_voting_strategy(strategy_name)
 
+    def _record_file_size(self):
+        try:
+            BOOKS_FILE_BYTES.set(os.path.getsize(self.books_file), file=self.books_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _source_stamp(raw: bytes):
+        # Identifies the exact books.json content a snapshot was built from.
+        # Hashing is far cheaper than parsing, and unlike mtime and size it
+        # also catches a rewrite of the same length (e.g. a reorder).
+        return (SNAPSHOT_VERSION, hashlib.blake2b(raw, digest_size=16).digest())
+
+    def _read_source(self) -> bytes:
+        with open(self.books_file, 'rb') as f:
+            return f.read()
+
+    def load_snapshot(self):
+        """
+        Loads the books from the snapshot if it was built from the current
+        books.json, otherwise returns None.
+        """
+        try:
+            with BOOKS_FILE_DURATION.time(operation='load_snapshot'):
+                with open(self.snapshot_file, 'rb') as f:
+                    stamp, rows = pickle.load(f)
+                current = self._source_stamp(self._read_source())
+            if stamp == current:
+                self.source_stamp = stamp
+                # The rows are already-initialised Book attributes, so skip __init__.
+                books = []
+                for attributes in rows:
+                    book = Book.__new__(Book)
+                    book.__dict__ = attributes
+                    books.append(book)
+                self._record_file_size()
+                return books
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            pass
+        return None
+
+    def save_snapshot(self, books=None):
+        """
+        Writes the books' attributes as a pickle stamped with a hash of the
+        books.json content they were loaded from. It is only read back while
+        books.json hashes the same, so it never serves stale data. Each writer
+        uses its own temporary file, so workers starting at once never
+        interleave their writes.
+        """
+        if self.source_stamp is None:
+            return False
+        tmp_file = None
+        try:
+            fd, tmp_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.snapshot_file) or '.',
+                prefix=os.path.basename(self.snapshot_file) + '.', suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                rows = [b.__dict__ for b in (self.books if books is None else books)]
+                pickle.dump((self.source_stamp, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.snapshot_file)
+            return True
+        except OSError as e:
+            if tmp_file is not None:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+            logger.warning("Could not write books snapshot", extra={"file": self.snapshot_file, "error": str(e)})
+            return False
+
     def load_books(self):
         """Loads books from JSON and converts them into Book objects."""
+        if self.use_snapshot:
+            books = self.load_snapshot()
+            if books is not None:
+                return books
+
         try:
-            with open(self.books_file, 'r') as f:
-                raw_data = json.load(f)
-                # MODIFIED: Create a list of Book objects instead of dicts.
-                return [Book(item) for item in raw_data]
-        except (FileNotFoundError, json.JSONDecodeError):
+            with BOOKS_FILE_DURATION.time(operation='load'):
+                raw = self._read_source()
+                raw_data = json.loads(raw)
+            self._record_file_size()
+            # MODIFIED: Create a list of Book objects instead of dicts.
+            books = [Book(item) for item in raw_data]
+            self.source_stamp = self._source_stamp(raw)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
             return [] # Return an empty list on error
 
+        # The snapshot was missing or stale; rebuild it for the next start.
+        if self.use_snapshot:
+            self.save_snapshot(books)
+        return books
+
     def save_books(self):
         """Saves the current list of books to the JSON file."""
         all_books_raw = [b.__dict__ for b in self.books]
         
         try:
-            with open(self.books_file, 'w') as f:
+            with BOOKS_FILE_DURATION.time(operation='save'), open(self.books_file, 'w') as f:
                 json.dump(all_books_raw, f, indent=4)
+            self._record_file_size()
+            self.source_stamp = None # books.json no longer matches the loaded content
         except IOError as e:
-            print(f"ERROR: Could not write to {self.books_file}. {e}")
+            logger.error("Could not write books file", extra={"file": self.books_file, "error": str(e)})
 
     def add_book(self, new_book_data: dict):
         """Enriches a new book, adds it to the store, and saves to file."""
         
+        # Imported here so workers that only serve votes never load the
+        # enrichment dependencies (requests, langdetect).
+        from .utils import enrich_single_book
+
         # 1. Enrich the new book data using your existing utility function
         enriched_data = enrich_single_book(new_book_data)
         
@@ -68,13 +173,16 @@ class BookStore:
 
         # Read the current file, filter out the book, and write back
         try:
-            with open(self.books_file, 'r') as f:
-                all_books = json.load(f)
-            
-            filtered_books = [b for b in all_books if b['id'] != book_id]
+            with BOOKS_FILE_DURATION.time(operation='delete'):
+                with open(self.books_file, 'r') as f:
+                    all_books = json.load(f)
+
+                filtered_books = [b for b in all_books if b['id'] != book_id]
 
-            with open(self.books_file, 'w') as f:
-                json.dump(filtered_books, f, indent=4)
+                with open(self.books_file, 'w') as f:
+                    json.dump(filtered_books, f, indent=4)
+            self._record_file_size()
+            self.source_stamp = None
             
             return True
         except (IOError, json.JSONDecodeError):
@@ -100,8 +208,10 @@ class BookStore:
         raw_books_to_save = [book.__dict__ for book in self.books]
         
         try:
-            with open(self.books_file, 'w') as f:
+            with BOOKS_FILE_DURATION.time(operation='reorder'), open(self.books_file, 'w') as f:
                 json.dump(raw_books_to_save, f, indent=4)
+            self._record_file_size()
+            self.source_stamp = None
             return True
         except IOError:
             return False
\ No newline at end of file
@@ -0,0 +1,312 @@
+import os
+import re
+import json
+import time
+import logging
+import atexit
+import threading
+from collections import OrderedDict
+from flask import current_app, g, abort, url_for
+from .books import BookStore
+from .voting import Ballot, is_valid_ranking, is_valid_points
+from .voting_manager import VotingManager
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+ELECTIONS_DIR = os.path.join('data', 'elections')
+ELECTION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+# Settings an election may override; everything else comes from the app config.
+ELECTION_SETTINGS = ('VOTING_SYSTEM', 'POINTS_PER_VOTER', 'VOTER_CODES')
+# Blueprints that are also served under /e/<election_id>
+ELECTION_BLUEPRINTS = ('main', 'admin')
+
+class Election:
+    """One club's election: its own books, settings, ballots and voters."""
+
+    def __init__(self, election_id, data_dir, config, book_store, voting_manager):
+        self.election_id = election_id
+        self.data_dir = data_dir
+        self.settings_file = os.path.join(data_dir, 'settings.json')
+        self.votes_file = os.path.join(data_dir, 'votes.json')
+        self.config = config
+        self.book_store = book_store
+        self.voting_manager = voting_manager
+        self.last_used = time.monotonic()
+        # Requests currently using this election; it is never evicted while in use.
+        self.in_use = 0
+        # Evictions whose save hasn't finished yet
+        self.pending_saves = 0
+        self._save_lock = threading.Lock()
+
+    def save_settings(self, new_settings: dict):
+        """Merges new settings into settings.json and applies them to this election."""
+        try:
+            with open(self.settings_file, 'r') as f:
+                settings = json.load(f)
+        except FileNotFoundError:
+            settings = {}
+        settings.update(new_settings)
+        with open(self.settings_file, 'w') as f:
+            json.dump(settings, f, indent=4)
+        self.config.update(settings)
+        self.voting_manager.set_voting_strategy(self.config)
+
+    def load_votes(self):
+        """Restores ballots and voters saved when the election was last evicted."""
+        try:
+            with open(self.votes_file, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        skipped = 0
+        for raw in state.get('ballots', []):
+            ranking, points = raw.get('ranking'), raw.get('points')
+            # Files saved before ballots were validated may hold ones no system can tally.
+            if not is_valid_ranking(ranking) or (points is not None and not is_valid_points(points)):
+                skipped += 1
+                continue
+            self.voting_manager.ballot_store.add(Ballot(ranking, points))
+        if skipped:
+            logger.warning("Skipped invalid saved ballots", extra={"election_id": self.election_id, "skipped": skipped})
+        self.voting_manager.voter_index.load(state.get('voters', []))
+
+    def save_votes(self):
+        """
+        Writes the ballots and voters to disk so the election can be evicted.
+        This replaces the file with this process's state; see ElectionRegistry
+        for why only one worker process may serve elections.
+        """
+        # Saves run one at a time, so a later save never gets overwritten by an
+        # earlier one, and the file is replaced whole so loads never see half of it.
+        try:
+            with self._save_lock:
+                tmp_file = self.votes_file + '.tmp'
+                with open(tmp_file, 'w') as f:
+                    json.dump(self.voting_manager.export_votes(), f)
+                os.replace(tmp_file, self.votes_file)
+        except IOError as e:
+            logger.error("Could not write votes file", extra={"file": self.votes_file, "error": str(e)})
+
+class ElectionRegistry:
+    """
+    Loads elections from data/elections/<election_id>/ on first use and
+    keeps at most `max_active` in memory. The least recently used election is
+    saved and evicted when the limit is reached or it has been idle too long.
+    Elections are pinned while a request uses them (see get/release) and are
+    never evicted while pinned. The default election (the original top-level
+    routes) is never evicted.
+
+    Ballots and voters live in this process's memory, so the app must run as
+    a single worker process (threads are fine). With several workers each
+    would hold its own copy of an election: a voter could vote once per
+    worker, and whichever worker saved last would overwrite votes.json with
+    only its own ballots.
+    """
+
+    def __init__(self, default_election, defaults, max_active=50, idle_seconds=3600):
+        self.default_election = default_election
+        self.defaults = defaults
+        self.max_active = max_active
+        self.idle_seconds = idle_seconds
+        self.elections = OrderedDict()
+        # Evicted elections whose votes are still being written to disk
+        self._unloading = {}
+        # Elections being read from disk, so concurrent requests wait for one load
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def election_dir(self, election_id):
+        return os.path.join(ELECTIONS_DIR, election_id)
+
+    def exists(self, election_id) -> bool:
+        return bool(ELECTION_ID_PATTERN.fullmatch(election_id)) and os.path.isdir(self.election_dir(election_id))
+
+    def get(self, election_id):
+        """
+        Returns the election, loading it if needed, or None if it does not
+        exist. The election is pinned until release() is called.
+        """
+        if election_id is None:
+            return self.default_election
+
+        while True:
+            with self._lock:
+                # An election that is still being saved is revived, rather
+                # than reloaded from a votes.json that may be missing its last ballots.
+                election = self.elections.get(election_id) or self._unloading.get(election_id)
+                if election is not None:
+                    evicted = self._pin(election_id, election)
+                    break
+                loading = self._loading.get(election_id)
+                if loading is None:
+                    loading = self._loading[election_id] = threading.Event()
+                    break
+            # Another request is loading it; wait, then look again.
+            loading.wait()
+
+        if election is None:
+            # Read from disk without the lock, so other elections aren't held up.
+            try:
+                election = self._load(election_id) if self.exists(election_id) else None
+            finally:
+                with self._lock:
+                    del self._loading[election_id]
+                    evicted = self._pin(election_id, election) if election is not None else []
+                loading.set()
+
+        self._save_evicted(evicted)
+        return election
+
+    def _pin(self, election_id, election):
+        """Marks an election active and in use (with the lock held); returns the evicted ones."""
+        self.elections[election_id] = election
+        self.elections.move_to_end(election_id)
+        election.in_use += 1
+        election.last_used = time.monotonic()
+        return self._evict()
+
+    def release(self, election):
+        """Unpins an election returned by get()."""
+        if election is self.default_election:
+            return
+        with self._lock:
+            election.in_use -= 1
+
+    def _load(self, election_id):
+        data_dir = self.election_dir(election_id)
+        # Only copy defaults that are set, so a missing one doesn't become None.
+        config = {key: self.defaults[key] for key in ELECTION_SETTINGS if self.defaults.get(key) is not None}
+        try:
+            with open(os.path.join(data_dir, 'settings.json'), 'r') as f:
+                config.update(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        voting_manager = VotingManager(
+            config.get('VOTING_SYSTEM') or 'plurality',
+            config.get('POINTS_PER_VOTER') or 5,
+            self.defaults.get('VOTER_INDEX_CAPACITY', 100000)
+        )
+        book_store = BookStore(os.path.join(data_dir, 'books.json'),
+                               use_snapshot=self.defaults.get('FAST_STARTUP', False))
+        election = Election(election_id, data_dir, config, book_store, voting_manager)
+        election.load_votes()
+        logger.info("Loaded election", extra={"election_id": election_id, "active": len(self.elections) + 1})
+        return election
+
+    def _evict(self):
+        """
+        Unloads stale elections (called with the lock held) and returns them;
+        the caller saves them once the lock is released.
+        """
+        # The OrderedDict is in recency order, so stale elections are at the front.
+        now = time.monotonic()
+        excess = len(self.elections) - self.max_active
+        evicted = []
+        for election_id, election in list(self.elections.items()):
+            if excess <= 0 and now - election.last_used < self.idle_seconds:
+                break
+            if election.in_use:
+                # Still serving a request; it can go once released.
+                continue
+            del self.elections[election_id]
+            election.pending_saves += 1
+            self._unloading[election_id] = election
+            evicted.append(election)
+            excess -= 1
+        return evicted
+
+    def _save_evicted(self, evicted):
+        for election in evicted:
+            election.save_votes()
+            with self._lock:
+                election.pending_saves -= 1
+                # If it was revived and evicted again, wait for that save too.
+                if not election.pending_saves and self._unloading.get(election.election_id) is election:
+                    del self._unloading[election.election_id]
+            logger.info("Evicted election", extra={"election_id": election.election_id})
+
+    def create(self, election_id, books=None, settings=None):
+        """Creates the data folder for a new election."""
+        if not ELECTION_ID_PATTERN.fullmatch(election_id):
+            raise ValueError("Election IDs may only contain letters, digits, '-' and '_'.")
+        data_dir = self.election_dir(election_id)
+        os.makedirs(data_dir, exist_ok=False)
+        with open(os.path.join(data_dir, 'books.json'), 'w') as f:
+            json.dump(books or [], f, indent=4)
+        with open(os.path.join(data_dir, 'settings.json'), 'w') as f:
+            json.dump(settings or {}, f, indent=4)
+
+    def save_all(self):
+        """Saves every active election, e.g. before shutdown."""
+        with self._lock:
+            elections = list(self.elections.values()) + list(self._unloading.values())
+        for election in elections:
+            election.save_votes()
+
+# --- Request Helpers ---
+
+def get_election():
+    """
+    Returns the election for the current request, or aborts with 404. It
+    stays pinned in memory until the request ends.
+    """
+    election = g.get('election')
+    if election is None:
+        election = current_app.election_registry.get(g.get('election_id'))
+        if election is None:
+            abort(404)
+        g.election = election
+    return election
+
+def release_election(exc=None):
+    """Unpins the request's election once the request is done."""
+    election = g.pop('election', None)
+    if election is not None:
+        current_app.election_registry.release(election)
+
+def election_url(endpoint, **values):
+    """
+    Template helper: url_for that stays inside the current election, so
+    'main.vote_page' becomes /e/<election_id>/vote when one is active.
+    """
+    if g.get('election_id') and endpoint.split('.')[0] in ELECTION_BLUEPRINTS:
+        endpoint = f"election_{endpoint}"
+    return url_for(endpoint, **values)
+
+def pull_election_id(endpoint, values):
+    """Moves the election id from the URL into `g`."""
+    g.election_id = values.pop('election_id', None) if values else None
+
+def add_election_id(endpoint, values):
+    """Fills in the election id when building URLs for election routes."""
+    if g.get('election_id') and 'election_id' not in values \
+            and current_app.url_map.is_endpoint_expecting(endpoint, 'election_id'):
+        values['election_id'] = g.election_id
+
+def init_elections(app, main_bp, admin_bp):
+    """Registers the per-election routes and the election registry."""
+    # The default election keeps the original top-level routes and shares the app config.
+    default_election = Election(None, 'data', app.config, app.book_store, app.voting_manager)
+
+    app.election_registry = ElectionRegistry(
+        default_election,
+        app.config,
+        max_active=app.config.get('MAX_ACTIVE_ELECTIONS', 50),
+        idle_seconds=app.config.get('ELECTION_IDLE_SECONDS', 3600)
+    )
+
+    # Evicted elections are saved as they go; save the rest on shutdown.
+    atexit.register(app.election_registry.save_all)
+
+    app.register_blueprint(main_bp, url_prefix='/e/<election_id>', name='election_main')
+    app.register_blueprint(admin_bp, url_prefix='/e/<election_id>/admin', name='election_admin')
+    app.teardown_request(release_election)
+    app.url_value_preprocessor(pull_election_id)
+    app.url_defaults(add_election_id)
+    app.jinja_env.globals['election_url'] = election_url
+
+    @app.context_processor
+    def inject_election():
+        election_id = g.get('election_id')
+        return {'election_base_url': f"/e/{election_id}" if election_id else ''}
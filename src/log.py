@@ -0,0 +1,46 @@
+import logging
+
+# Attributes every LogRecord has; anything else was passed in `extra`.
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+def _logfmt_value(value) -> str:
+    # Values such as book titles and error text come from outside; escaping
+    # line breaks keeps them from starting what looks like a new log line.
+    text = str(value)
+    if not text or any(c in text for c in ' ="\n\r\t'):
+        return '"' + ''.join(_ESCAPES.get(c, c) for c in text) + '"'
+    return text
+
+class LogfmtFormatter(logging.Formatter):
+    """
+    Formats records as logfmt key=value pairs, e.g.
+    ts=2024-05-01T12:00:00 level=info logger=src.elections msg="Loaded election" election_id=club1
+    Fields passed with `extra={...}` are appended after the message.
+    """
+
+    def format(self, record):
+        fields = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                fields[key] = value
+        line = ' '.join(f"{key}={_logfmt_value(value)}" for key, value in fields.items())
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+def configure_logging(level='INFO'):
+    """Sends the app's logs to stderr in logfmt, unless logging is already configured."""
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(LogfmtFormatter())
+    root.addHandler(handler)
+    root.setLevel(level)
@@ -1,6 +1,11 @@
 import csv
 import io
-from flask import Blueprint, render_template, jsonify, Response, request, current_app
+import uuid
+from flask import Blueprint, render_template, jsonify, Response, request, session, current_app
+from .admission import admission_controlled
+from .elections import get_election
+from .metrics import VOTES_TOTAL
+from .voting_manager import VOTE_ACCEPTED, VOTE_DUPLICATE
 
 main_bp = Blueprint('main', __name__)
 
@@ -15,22 +20,46 @@ def vote_page():
     # The BookStore is already loaded at startup. This call is not needed
     # and was preventing newly added books from appearing.
     # current_app.book_store.load_books() 
+    election = get_election()
+    # Only the vote page hands out voter IDs; admission control keys on them too.
+    if 'voter_id' not in session:
+        session['voter_id'] = uuid.uuid4().hex
     return render_template(
         'vote.html', 
-        books=current_app.book_store.books, 
-        voting_system=current_app.config['VOTING_SYSTEM'],
-        points_per_voter=current_app.config.get('POINTS_PER_VOTER', 5)
+        books=election.book_store.books, 
+        voting_system=election.config['VOTING_SYSTEM'],
+        points_per_voter=election.config.get('POINTS_PER_VOTER') or 5,
+        requires_voter_code=bool(election.config.get('VOTER_CODES'))
     )
 
+def get_voter_id(election, vote_data):
+    """
+    Identifies the voter, or returns None if the ballot can't be attributed.
+    If the admin has issued per-election voter codes, the ballot must carry
+    one of them. Otherwise the voter is the random ID the vote page stored in
+    the signed session cookie; a ballot without one is never given a new ID.
+    """
+    voter_codes = election.config.get('VOTER_CODES')
+    if voter_codes:
+        if not isinstance(voter_codes, frozenset):
+            # settings.json stores a list; keep a set so lookups stay O(1).
+            voter_codes = election.config['VOTER_CODES'] = frozenset(voter_codes)
+        code = vote_data.get('voter_code') if isinstance(vote_data, dict) else None
+        return f"code:{code}" if code in voter_codes else None
+
+    voter_id = session.get('voter_id')
+    return f"session:{voter_id}" if voter_id else None
+
 @main_bp.route('/results')
 def get_results():
     """Provides the current vote counts as JSON."""
-    return jsonify(current_app.voting_manager.get_public_results())
+    return jsonify(get_election().voting_manager.get_public_results())
 
 # MODIFIED: This route now handles both plurality and ranked-choice votes.
 # It accepts POST requests to /vote and /vote/<book_id>
 @main_bp.route('/vote', methods=['POST'])
 @main_bp.route('/vote/<string:book_id>', methods=['POST'])
+@admission_controlled
 def vote(book_id=None):
     """Records a vote using the current voting strategy."""
     
@@ -38,19 +67,43 @@ def vote(book_id=None):
     if book_id:
         # This is a plurality vote from the old system, e.g., /vote/book_123
         vote_data = {'book_id': book_id}
+        # A voter code may come as a JSON body or as ?voter_code=...
+        body = request.get_json(silent=True)
+        voter_code = body.get('voter_code') if isinstance(body, dict) else None
+        voter_code = voter_code or request.args.get('voter_code')
+        if voter_code:
+            vote_data['voter_code'] = voter_code
     else:
         # This is a ranked-choice vote with a JSON body
         vote_data = request.get_json()
 
     if not vote_data:
+        VOTES_TOTAL.inc(outcome='invalid')
         return jsonify(success=False, message="Missing vote data."), 400
 
+    election = get_election()
+
+    # NEW: Identify the voter so the manager can reject repeat ballots
+    voter_id = None
+    if current_app.config.get('ONE_VOTE_PER_VOTER', True):
+        voter_id = get_voter_id(election, vote_data)
+        if not voter_id:
+            VOTES_TOTAL.inc(outcome='unauthorized')
+            if election.config.get('VOTER_CODES'):
+                message = "A valid voter code is required."
+            else:
+                message = "Please open the vote page before voting."
+            return jsonify(success=False, message=message), 403
+
     # Let the strategy object handle the data
-    success = current_app.voting_manager.record_vote(vote_data)
-    
-    if success:
+    outcome = election.voting_manager.record_vote(vote_data, voter_id)
+    VOTES_TOTAL.inc(outcome=outcome)
+
+    if outcome == VOTE_ACCEPTED:
         return jsonify(success=True, message="Vote recorded successfully.")
-    
+    if outcome == VOTE_DUPLICATE:
+        return jsonify(success=False, message="You have already voted."), 409
+
     # If the strategy failed, it's because the data was wrong for it
     return jsonify(success=False, message="Invalid vote data for the current voting system."), 400
 
@@ -58,14 +111,15 @@ def vote(book_id=None):
 @main_bp.route('/export')
 def export_results():
     """Exports the current vote counts to a CSV file."""
+    election = get_election()
     output = io.StringIO()
     writer = csv.writer(output)
     
-    book_titles = {book.id: book.title for book in current_app.book_store.books}
+    book_titles = {book.id: book.title for book in election.book_store.books}
     
     writer.writerow(['Book Title', 'Votes'])
     
-    results = current_app.voting_manager.get_public_results()
+    results = election.voting_manager.get_public_results()
     for book_id, count in results.items():
         writer.writerow([book_titles.get(book_id, 'Unknown Book'), count])
     
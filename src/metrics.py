@@ -0,0 +1,184 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from flask import g, request
+
+# --- Configuration ---
+# Latency buckets in seconds, from sub-millisecond cache hits to slow API calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_collectors = {}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for a metric family with optional labels."""
+    metric_type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Counter(Metric):
+    """A value that only goes up."""
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(Metric):
+    """Counts observations into fixed buckets, Prometheus style."""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last slot is +Inf), then sum.
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes how long the body of a `with` block takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def register_collector(name, collect):
+    """
+    Registers a function that returns (name, type, help, labelnames, samples)
+    tuples at scrape time, for values that already live elsewhere. Registering
+    the same name again replaces the previous collector.
+    """
+    _collectors[name] = collect
+
+def render_metrics() -> str:
+    """Renders every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors.values():
+        for name, metric_type, documentation, labelnames, samples in collect():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labelvalues, value in sorted(samples.items()):
+                lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+# --- Application Metrics ---
+
+REQUEST_LATENCY = Histogram(
+    'bookclub_request_duration_seconds', 'Time spent handling a request.', ('route', 'method', 'status'))
+VOTES_TOTAL = Counter(
+    'bookclub_votes_total', 'Vote submissions by outcome.', ('outcome',))
+TALLY_DURATION = Histogram(
+    'bookclub_tally_duration_seconds', 'Time spent tallying ballots.', ('strategy', 'kind'))
+BOOKS_FILE_DURATION = Histogram(
+    'bookclub_books_file_duration_seconds', 'Time spent reading or writing books.json.', ('operation',))
+BOOKS_FILE_BYTES = Gauge(
+    'bookclub_books_file_bytes', 'Size of books.json at the last read or write.', ('file',))
+ENRICHMENT_LATENCY = Histogram(
+    'bookclub_enrichment_request_duration_seconds', 'Google Books API request latency.', ('status',))
+ENRICHMENT_CACHE = Counter(
+    'bookclub_enrichment_cache_total', 'Enrichment lookups answered from the cache or the API.', ('result',))
+
+STARTUP_DURATION = Gauge(
+    'bookclub_startup_duration_seconds', 'Time spent starting the app, by phase.', ('phase',))
+
+def init_metrics(app):
+    """Times every request and exports the admission control and election counters."""
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            # Label by route pattern, not by URL, to keep the number of series bounded.
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start, route=route, method=request.method, status=response.status_code)
+        return response
+
+    def collect_app_stats():
+        stats = app.admission_controller.get_stats()
+        shed = {('rate_limited',): stats['shed_rate_limited'], ('over_capacity',): stats['shed_over_capacity']}
+        return [
+            ('bookclub_vote_requests_accepted_total', 'counter', 'Vote requests admitted.', (),
+             {(): stats['accepted']}),
+            ('bookclub_vote_requests_shed_total', 'counter', 'Vote requests rejected with 429.', ('reason',), shed),
+            ('bookclub_active_elections', 'gauge', 'Elections currently loaded in memory.', (),
+             {(): len(app.election_registry.elections)}),
+        ]
+    register_collector('app', collect_app_stats)
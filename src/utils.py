@@ -1,10 +1,16 @@
 import os
 import json
+import logging
 import requests
 import time
 import re
+import threading
+from collections import OrderedDict
 from html.parser import HTMLParser
 from langdetect import detect, LangDetectException
+from .metrics import ENRICHMENT_LATENCY, ENRICHMENT_CACHE
+
+logger = logging.getLogger(__name__)
 
 # NEW: Create a custom HTML parser class to strip tags.
 class MLStripper(HTMLParser):
@@ -30,6 +36,12 @@ def strip_tags(html_text: str) -> str:
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 BOOKS_FILE = os.path.join(project_root, 'data', 'books.json')
 API_BASE_URL = "https://www.googleapis.com/books/v1/volumes"
+# Number of API responses kept in memory, so re-adding a book doesn't hit the API again.
+API_CACHE_SIZE = 256
+
+_api_cache = OrderedDict()
+# Request threads can add books at the same time.
+_api_cache_lock = threading.Lock()
 
 def is_promotional_text(text: str) -> bool:
     """
@@ -75,11 +87,11 @@ def is_supplementary_material(volume_info: dict, cleaned_summary: str) -> bool:
     
     # Check for keywords in the title or at the beginning of the summary
     if any(keyword in title for keyword in supplementary_keywords):
-        print(f"  -> Rejecting due to supplementary keyword in title: '{volume_info.get('title')}'")
+        logger.info("Rejecting: supplementary keyword in title", extra={"volume": volume_info.get('title')})
         return True
     
     if any(summary_lower.startswith(keyword) for keyword in supplementary_keywords):
-        print(f"  -> Rejecting due to supplementary keyword in summary: '{volume_info.get('title')}'")
+        logger.info("Rejecting: supplementary keyword in summary", extra={"volume": volume_info.get('title')})
         return True
         
     return False
@@ -93,19 +105,57 @@ def is_collection_or_box_set(volume_info: dict) -> bool:
     title = volume_info.get('title', '').lower()
     collection_keywords = ['box set', 'collection', 'trilogy', 'series', 'omnibus']
     if any(keyword in title for keyword in collection_keywords):
-        print(f"  -> Rejecting due to keyword in title: '{volume_info.get('title')}'")
+        logger.info("Rejecting: collection keyword in title", extra={"volume": volume_info.get('title')})
         return True
 
     page_count = volume_info.get('pageCount')
 
     # NEW: Check for a page count of 0, which often indicates a placeholder.
     if page_count == 0:
-        print(f"  -> Rejecting due to page count of 0: '{volume_info.get('title')}'")
+        logger.info("Rejecting: page count of 0", extra={"volume": volume_info.get('title')})
         return True
 
         
     return False
 
+def fetch_volumes(params: dict) -> dict:
+    """
+    Queries the Google Books API, answering repeated queries from an
+    in-memory LRU cache. Raises requests.exceptions.RequestException on failure.
+    """
+    key = tuple(sorted(params.items()))
+    with _api_cache_lock:
+        data = _api_cache.get(key)
+        if data is not None:
+            _api_cache.move_to_end(key)
+    if data is not None:
+        ENRICHMENT_CACHE.inc(result='hit')
+        return data
+    ENRICHMENT_CACHE.inc(result='miss')
+
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        response = requests.get(API_BASE_URL, params=params)
+        status = str(response.status_code)
+        response.raise_for_status()
+        data = response.json()
+    finally:
+        ENRICHMENT_LATENCY.observe(time.perf_counter() - start, status=status)
+
+    # The request itself runs unlocked; only the cache update is guarded.
+    with _api_cache_lock:
+        _api_cache[key] = data
+        _api_cache.move_to_end(key)
+        if len(_api_cache) > API_CACHE_SIZE:
+            _api_cache.popitem(last=False)
+    return data
+
+def cache_api_response(params: dict, data: dict):
+    """Seeds the API cache with a known response, e.g. a benchmark fixture."""
+    with _api_cache_lock:
+        _api_cache[tuple(sorted(params.items()))] = data
+
 def enrich_single_book(book: dict) -> dict:
     """
     Takes a book dictionary, queries the Google Books API, and returns
@@ -114,15 +164,13 @@ def enrich_single_book(book: dict) -> dict:
     title = book.get("title", "")
     author = book.get("author", "")
     
-    print(f"Fetching data for '{title}' by {author}...")
+    logger.info("Fetching book data", extra={"title": title, "author": author})
     query = f"intitle:{title}+inauthor:{author}"
     # MODIFIED: Add orderBy='newest' to get a better selection of results
     params = {"q": query, "maxResults": 10, "langRestrict": "en", "orderBy": "newest"}
 
     try:
-        response = requests.get(API_BASE_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_volumes(params)
 
         if "items" in data and len(data["items"]) > 0:
             best_volume_info = None
@@ -130,7 +178,7 @@ def enrich_single_book(book: dict) -> dict:
             # --- MODIFIED: Implement a new two-pass filtering strategy ---
 
             # Pass 1: Look for a "perfect" standalone novel.
-            print("  -> Pass 1: Searching for a standalone novel...")
+            logger.info("Pass 1: Searching for a standalone novel", extra={"title": title})
             for item in data["items"]:
                 volume_info = item.get("volumeInfo", {})
                 page_count = volume_info.get("pageCount")
@@ -141,13 +189,15 @@ def enrich_single_book(book: dict) -> dict:
                     page_count and 10 < page_count < 600 and  # Must have a reasonable page count
                     not is_supplementary_material(volume_info, strip_tags(volume_info.get('description', '')))
                 ):
-                    print(f"  -> Found a likely standalone edition published on {volume_info.get('publishedDate')}.")
+                    logger.info("Found a likely standalone edition",
+                                extra={"title": title, "published_date": volume_info.get('publishedDate')})
                     best_volume_info = volume_info
                     break  # Found a perfect match, stop searching.
             
             # Pass 2: If no perfect match was found, fall back to the old logic.
             if not best_volume_info:
-                print("  -> Pass 2: No standalone novel found. Searching for the best available edition...")
+                logger.info("Pass 2: No standalone novel found. Searching for the best available edition",
+                            extra={"title": title})
                 candidate_volumes = []
                 for item in data["items"]:
                     volume_info = item.get("volumeInfo", {})
@@ -167,7 +217,10 @@ def enrich_single_book(book: dict) -> dict:
                 if candidate_volumes:
                     candidate_volumes.sort(key=lambda v: v.get('publishedDate', '9999'))
                     best_volume_info = candidate_volumes[0]
-                    print(f"  -> Found {len(candidate_volumes)} candidates. Choosing earliest: {best_volume_info.get('publishedDate')}")
+                    logger.info("Choosing earliest candidate", extra={
+                        "title": title, "candidates": len(candidate_volumes),
+                        "published_date": best_volume_info.get('publishedDate')
+                    })
 
             # --- The rest of the function proceeds as before ---
             if best_volume_info:
@@ -189,15 +242,15 @@ def enrich_single_book(book: dict) -> dict:
                 
                 image_links = best_volume_info.get('imageLinks', {})
                 book['cover_image_url'] = image_links.get('thumbnail')
-                print(f"  -> Success: Enriched '{title}' with data from {book['published_date']} edition.")
+                logger.info("Enriched book", extra={"title": title, "published_date": book['published_date']})
             else:
-                print(f"  -> No suitable editions found for '{title}' after filtering.")
+                logger.warning("No suitable editions found after filtering", extra={"title": title})
                 book['summary'] = 'Could not find a valid edition.'
         else:
-            print(f"  -> Warning: Could not find a match for '{title}'.")
+            logger.warning("Could not find a match", extra={"title": title})
 
     except requests.exceptions.RequestException as e:
-        print(f"  -> Error: API request failed for '{title}'. Reason: {e}")
+        logger.error("API request failed", extra={"title": title, "error": str(e)})
     
     return book
 
@@ -210,11 +263,11 @@ def enrich_book_data():
         with open(BOOKS_FILE, 'r') as f:
             books = json.load(f)
     except FileNotFoundError:
-        print(f"Error: {BOOKS_FILE} not found.")
+        logger.error("Books file not found", extra={"file": BOOKS_FILE})
         return
 
     enriched_books = []
-    print("Starting book enrichment process...")
+    logger.info("Starting book enrichment process", extra={"books": len(books)})
 
     for book in books:
         enriched_book = enrich_single_book(book)
@@ -224,7 +277,10 @@ def enrich_book_data():
     with open(BOOKS_FILE, 'w') as f:
         json.dump(enriched_books, f, indent=4)
 
-    print("\nEnrichment complete. books.json has been updated.")
+    logger.info("Enrichment complete. books.json has been updated.")
 
 if __name__ == "__main__":
+    # Run as a module from the project root: python -m src.utils
+    from .log import configure_logging
+    configure_logging()
     enrich_book_data()
\ No newline at end of file
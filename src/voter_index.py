@@ -0,0 +1,102 @@
+import math
+import hashlib
+import threading
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings, sized for a target capacity and error rate."""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        capacity = max(1, capacity)
+        # Standard sizing: m = -n ln(p) / (ln 2)^2 bits, k = (m / n) ln 2 hashes
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        return self._key_positions(hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest())
+
+    def _key_positions(self, digest: bytes):
+        # Double hashing: derive k positions from one 128-bit digest.
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def add_key(self, digest: bytes):
+        """Adds an item by its 16-byte blake2b digest."""
+        for pos in self._key_positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class VoterIndex:
+    """
+    Remembers which voters have already cast a ballot. A Bloom filter answers
+    "definitely new" without touching the exact set; only possible repeats
+    are confirmed against the set of voter ID digests.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forgets every voter, e.g. when a new election starts."""
+        self.prefilter = BloomFilter(self.capacity, self.error_rate)
+        # Store fixed-size digests rather than the raw IDs to bound memory per voter.
+        self.voters = set()
+        self.duplicates_rejected = 0
+
+    @staticmethod
+    def _key(voter_id: str) -> bytes:
+        return hashlib.blake2b(voter_id.encode('utf-8'), digest_size=16).digest()
+
+    def has_voted(self, voter_id: str) -> bool:
+        """Checks whether a voter is already in the index."""
+        if voter_id not in self.prefilter:
+            return False
+        return self._key(voter_id) in self.voters
+
+    def add(self, voter_id: str) -> bool:
+        """
+        Adds a voter. Returns False (and counts a rejected duplicate) if
+        the voter was already present.
+        """
+        with self._lock:
+            if self.has_voted(voter_id):
+                self.duplicates_rejected += 1
+                return False
+            self.prefilter.add(voter_id)
+            self.voters.add(self._key(voter_id))
+            return True
+
+    def record_rejection(self):
+        """Counts a duplicate that was rejected before reaching add()."""
+        with self._lock:
+            self.duplicates_rejected += 1
+
+    def export(self) -> list:
+        """Returns the stored voter digests as hex strings, for saving to disk."""
+        with self._lock:
+            return [key.hex() for key in self.voters]
+
+    def load(self, hex_keys):
+        """Adds voter digests previously returned by export()."""
+        with self._lock:
+            for hex_key in hex_keys:
+                key = bytes.fromhex(hex_key)
+                self.voters.add(key)
+                self.prefilter.add_key(key)
+
+    def get_stats(self) -> dict:
+        return {
+            "unique_voters": len(self.voters),
+            "duplicates_rejected": self.duplicates_rejected,
+            "prefilter_bytes": len(self.prefilter.bits),
+        }
@@ -1,69 +1,176 @@
+import threading
 from abc import ABC, abstractmethod
 from collections import Counter
+from .metrics import TALLY_DURATION
+
+VOTING_SYSTEMS = ['plurality', 'ranked_choice', 'cumulative']
+
+class Ballot:
+    """
+    A voting-system-independent ballot: the voter's books in order of
+    preference, plus the points given to each book if the voter allocated any.
+    """
+
+    __slots__ = ('ranking', 'points')
+
+    def __init__(self, ranking, points=None):
+        self.ranking = tuple(ranking)
+        self.points = points
+
+    def __repr__(self):
+        return f"<Ballot(ranking={self.ranking}, points={self.points})>"
+
+def is_valid_ranking(ranking) -> bool:
+    """Book IDs in order of preference: non-empty strings, each at most once."""
+    if not isinstance(ranking, (list, tuple)):
+        return False
+    # This runs for every ballot, so let C do the per-item work: join()
+    # rejects anything that isn't a string, all() any empty ones.
+    try:
+        ''.join(ranking)
+    except TypeError:
+        return False
+    return all(ranking) and len(set(ranking)) == len(ranking)
+
+def is_valid_points(points) -> bool:
+    """A {book_id: points} allocation with non-negative whole points."""
+    # bool is an int subclass, but True is not a number of points.
+    return isinstance(points, dict) and all(
+        isinstance(book_id, str) and book_id and type(p) is int and p >= 0
+        for book_id, p in points.items())
+
+class BallotStore:
+    """
+    Keeps every ballot cast, whatever system was active when it was cast.
+    `version` changes on every write so strategies can cache their results.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ballots = []
+        self.version = 0
+
+    def add(self, ballot: Ballot):
+        with self._lock:
+            self.ballots.append(ballot)
+            self.version += 1
+
+    def clear(self):
+        with self._lock:
+            self.ballots = []
+            self.version += 1
+
+    def snapshot(self):
+        """Returns the version and a copy of the ballots, read together."""
+        with self._lock:
+            return self.version, list(self.ballots)
+
+    def __len__(self):
+        return len(self.ballots)
 
 class VotingStrategy(ABC):
     """Abstract base class for a voting system."""
-    
+
+    def __init__(self, ballot_store=None):
+        self.ballot_store = ballot_store if ballot_store is not None else BallotStore()
+        self._cache = {}
+        self._cache_version = None
+        self._cache_lock = threading.Lock()
+
     @abstractmethod
-    def record_vote(self, vote_data):
-        """Records a new vote."""
+    def parse_ballot(self, vote_data):
+        """Validates vote data for this system and returns a Ballot, or None."""
         pass
 
     @abstractmethod
-    def calculate_results(self, books):
-        """Calculates and returns the results."""
+    def tally(self, ballots, books):
+        """Calculates the results from a list of Ballots."""
         pass
 
     @abstractmethod
+    def public_tally(self, ballots):
+        """Returns a simplified {book_id: count} dictionary for the frontend."""
+        pass
+
+    def record_vote(self, vote_data):
+        """Records a new vote in the shared ballot store."""
+        ballot = self.parse_ballot(vote_data)
+        if ballot is None:
+            return False
+        self.ballot_store.add(ballot)
+        return True
+
+    def _cached(self, key, compute):
+        # Results stay valid until the ballot store changes. A result is only
+        # cached under the version its ballots were read at, so a slow tally
+        # can't leave a stale result behind for a newer version.
+        with self._cache_lock:
+            if self._cache_version == self.ballot_store.version and key in self._cache:
+                return self._cache[key]
+
+        version, ballots = self.ballot_store.snapshot()
+        kind = key if isinstance(key, str) else key[0]
+        with TALLY_DURATION.time(strategy=type(self).__name__, kind=kind):
+            result = compute(ballots)
+
+        with self._cache_lock:
+            if self._cache_version != version and version == self.ballot_store.version:
+                self._cache = {}
+                self._cache_version = version
+            if self._cache_version == version:
+                self._cache[key] = result
+        return result
+
+    def calculate_results(self, books):
+        """Calculates and returns the results."""
+        book_ids = tuple(book.id for book in books)
+        return self._cached(('results', book_ids), lambda ballots: self.tally(ballots, books))
+
     def get_public_results(self):
         """Returns a simplified dictionary for the frontend."""
-        pass
+        return self._cached('public', self.public_tally)
 
 class PluralityStrategy(VotingStrategy):
     """Simple plurality voting: one vote per person."""
-    def __init__(self):
-        self.votes = Counter()
 
-    def record_vote(self, vote_data):
+    def parse_ballot(self, vote_data):
         book_id = vote_data.get('book_id')
-        if book_id:
-            self.votes[book_id] += 1
-            return True
-        return False
+        if isinstance(book_id, str) and book_id:
+            return Ballot([book_id])
+        return None
 
-    def calculate_results(self, books):
-        # For plurality, the raw votes are the results.
-        return self.votes
+    def public_tally(self, ballots):
+        # Ranked and cumulative ballots count for their first choice.
+        return dict(Counter(b.ranking[0] for b in ballots if b.ranking))
 
-    def get_public_results(self):
-        return dict(self.votes)
+    def tally(self, ballots, books):
+        # For plurality, the raw votes are the results.
+        return self.public_tally(ballots)
 
 class RankedChoiceStrategy(VotingStrategy):
     """Ranked-choice (Instant-runoff) voting."""
-    def __init__(self):
-        self.ballots = []
 
-    def record_vote(self, vote_data):
+    def parse_ballot(self, vote_data):
         # Expects vote_data to be an ordered list of book_ids
+        # Stored ballots outlive strategy switches, so reject anything other
+        # systems couldn't tally (duplicates, non-string IDs) here.
         ballot = vote_data.get('ballot')
-        if isinstance(ballot, list) and ballot:
-            self.ballots.append(ballot)
-            return True
-        return False
+        if ballot and isinstance(ballot, list) and is_valid_ranking(ballot):
+            return Ballot(ballot)
+        return None
 
-    def get_public_results(self):
+    def public_tally(self, ballots):
         # For ranked choice, we can show the first-preference votes
-        first_preferences = Counter(ballot[0] for ballot in self.ballots if ballot)
-        return dict(first_preferences)
+        return dict(Counter(b.ranking[0] for b in ballots if b.ranking))
 
-    def calculate_results(self, books):
+    def tally(self, ballots, books):
         # This is a simplified implementation of IRV.
         # A full implementation would handle multiple rounds.
-        if not self.ballots:
+        if not ballots:
             return {}
-        
+
         num_rounds = 1
-        temp_ballots = [list(b) for b in self.ballots] # Make a copy
+        temp_ballots = [list(b.ranking) for b in ballots] # Make a copy
 
         while num_rounds <= len(books):
             counts = Counter(b[0] for b in temp_ballots if b)
@@ -77,57 +184,58 @@ class RankedChoiceStrategy(VotingStrategy):
             # Find the loser (book with the fewest first-place votes)
             if not counts:
                 return {"winner": "Tie", "rounds": num_rounds, "final_counts": {}}
-            
+
             loser = min(counts, key=counts.get)
 
             # Eliminate the loser and redistribute votes
             for ballot in temp_ballots:
                 if loser in ballot:
                     ballot.remove(loser)
-            
+
             num_rounds += 1
-        
+
         # If no winner after all rounds, it's complex. Return first-preference for now.
-        return self.get_public_results()
+        return self.public_tally(ballots)
 
 class CumulativeVotingStrategy(VotingStrategy):
     """Cumulative voting: voters distribute a set number of points among books."""
-    def __init__(self, points_per_voter=5):
+
+    def __init__(self, points_per_voter=5, ballot_store=None):
+        super().__init__(ballot_store)
         self.points_per_voter = points_per_voter
-        self.votes = []  # Each vote is a dict {book_id: points}
 
-    def record_vote(self, vote_data):
+    def parse_ballot(self, vote_data):
         # Expects vote_data to be a dict of {book_id: points}
         ballot = vote_data.get('ballot')
-        if not isinstance(ballot, dict) or not ballot:
-            return False
+        if not ballot or not is_valid_points(ballot):
+            return None
         total_points = sum(ballot.values())
         if total_points != self.points_per_voter:
-            return False  # Invalid ballot
-        self.votes.append(ballot)
-        return True
-
-    def calculate_results(self, books):
-        # Sum points for each book
+            return None  # Invalid ballot
+        # Rank the books by points, highest first, so other systems can re-tally it.
+        ranking = sorted((b for b in ballot if ballot[b] > 0), key=lambda b: -ballot[b])
+        return Ballot(ranking, points=dict(ballot))
+
+    def public_tally(self, ballots):
+        # Sum points for each book. A ballot cast without points (plurality or
+        # ranked choice) gives all of its points to its first choice.
         results = Counter()
-        for ballot in self.votes:
-            for book_id, points in ballot.items():
-                results[book_id] += points
+        for ballot in ballots:
+            if ballot.points is not None:
+                for book_id, points in ballot.points.items():
+                    results[book_id] += points
+            elif ballot.ranking:
+                results[ballot.ranking[0]] += self.points_per_voter
         return dict(results)
 
-    def get_public_results(self):
-        # Show current point totals for each book
-        results = Counter()
-        for ballot in self.votes:
-            for book_id, points in ballot.items():
-                results[book_id] += points
-        return dict(results)
+    def tally(self, ballots, books):
+        return self.public_tally(ballots)
 
 # Factory to get the correct strategy
-def get_voting_strategy(strategy_name: str, points_per_voter: int = 5) -> VotingStrategy:
+def get_voting_strategy(strategy_name: str, points_per_voter: int = 5, ballot_store=None) -> VotingStrategy:
     if strategy_name == 'ranked_choice':
-        return RankedChoiceStrategy()
+        return RankedChoiceStrategy(ballot_store)
     if strategy_name == 'cumulative':
-        return CumulativeVotingStrategy(points_per_voter=points_per_voter)
+        return CumulativeVotingStrategy(points_per_voter=points_per_voter, ballot_store=ballot_store)
     # Default to plurality
-    return PluralityStrategy()
\ No newline at end of file
+    return PluralityStrategy(ballot_store)
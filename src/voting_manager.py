@@ -1,24 +1,98 @@
 # src/voting_manager.py
+import logging
+import threading
 from flask import current_app
-from .voting import get_voting_strategy
+from .voting import get_voting_strategy, BallotStore, VOTING_SYSTEMS
+from .voter_index import VoterIndex
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of record_vote (also used as the votes_total metric's labels)
+VOTE_ACCEPTED = 'accepted'
+VOTE_DUPLICATE = 'duplicate'
+VOTE_INVALID = 'invalid'
 
 class VotingManager:
-    def __init__(self, strategy_name='plurality', points_per_voter=5):
-        self.voting_strategy = get_voting_strategy(strategy_name, points_per_voter)
-        print(f"VotingManager initialized with strategy: {strategy_name}")
+    def __init__(self, strategy_name='plurality', points_per_voter=5, voter_capacity=100000):
+        # NEW: Every ballot lives here, independent of the active strategy,
+        # so switching systems re-tallies instead of discarding votes.
+        self.ballot_store = BallotStore()
+        self._strategies = {}
+        self.points_per_voter = points_per_voter
+        self.voting_strategy = self._get_strategy(strategy_name, points_per_voter)
+        # NEW: Remembers who has voted so each voter only gets one ballot
+        self.voter_index = VoterIndex(capacity=voter_capacity)
+        self._lock = threading.Lock()
+        logger.info("VotingManager initialized", extra={"strategy": strategy_name})
+
+    def _get_strategy(self, strategy_name, points_per_voter):
+        """Returns a strategy over the shared ballot store, reusing it (and its cached results) if possible."""
+        key = (strategy_name, points_per_voter)
+        if key not in self._strategies:
+            self._strategies[key] = get_voting_strategy(strategy_name, points_per_voter, self.ballot_store)
+        return self._strategies[key]
+
+    def set_voting_strategy(self, config=None):
+        """Initializes or updates the voting strategy from the given (or app) config."""
+        config = config if config is not None else current_app.config
+        strategy_name = config.get('VOTING_SYSTEM') or 'plurality'
+        points = config.get('POINTS_PER_VOTER') or 5
+        with self._lock:
+            self.points_per_voter = points
+            self.voting_strategy = self._get_strategy(strategy_name, points)
+        logger.info("VotingManager strategy updated",
+                    extra={"strategy": strategy_name, "ballots_kept": len(self.ballot_store)})
 
-    def set_voting_strategy(self):
-        """Initializes or updates the voting strategy from the app config."""
-        strategy_name = current_app.config.get('VOTING_SYSTEM', 'plurality')
-        points = current_app.config.get('POINTS_PER_VOTER', 5)
-        self.voting_strategy = get_voting_strategy(strategy_name, points)
-        print(f"VotingManager strategy updated to: {strategy_name}")
+    def reset_votes(self):
+        """Discards every ballot and lets everyone vote again, e.g. for a new election."""
+        with self._lock:
+            self.ballot_store.clear()
+            self.voter_index.reset()
+        logger.info("VotingManager votes reset")
 
-    def record_vote(self, vote_data):
-        return self.voting_strategy.record_vote(vote_data)
+    def is_duplicate_vote(self, voter_id):
+        """Checks whether a voter has already voted, counting the rejection if so."""
+        if voter_id and self.voter_index.has_voted(voter_id):
+            self.voter_index.record_rejection()
+            return True
+        return False
+
+    def record_vote(self, vote_data, voter_id=None):
+        """
+        Records a vote and returns VOTE_ACCEPTED, VOTE_DUPLICATE or
+        VOTE_INVALID. When a voter_id is given, a second ballot from the same
+        voter is rejected; the check and the insert share one lock, so
+        concurrent repeats can't both get through.
+        """
+        with self._lock:
+            if self.is_duplicate_vote(voter_id):
+                return VOTE_DUPLICATE
+            if not self.voting_strategy.record_vote(vote_data):
+                return VOTE_INVALID
+            if voter_id:
+                self.voter_index.add(voter_id)
+            return VOTE_ACCEPTED
+
+    def export_votes(self):
+        """A consistent copy of the ballots and voters, for saving to disk."""
+        with self._lock:
+            return {
+                "ballots": [{"ranking": list(b.ranking), "points": b.points} for b in self.ballot_store.ballots],
+                "voters": self.voter_index.export()
+            }
+
+    def get_voter_stats(self):
+        return self.voter_index.get_stats()
 
     def get_public_results(self):
         return self.voting_strategy.get_public_results()
 
     def calculate_results(self, books):
-        return self.voting_strategy.calculate_results(books)
\ No newline at end of file
+        return self.voting_strategy.calculate_results(books)
+
+    def compare_results(self, books):
+        """Tallies the stored ballots under every voting system, side by side."""
+        return {
+            name: self._get_strategy(name, self.points_per_voter).calculate_results(books)
+            for name in VOTING_SYSTEMS
+        }
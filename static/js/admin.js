@@ -1,3 +1,6 @@
+// Prefix for API calls; set to /e/<election_id> when managing a specific election.
+const BASE_URL = document.body.dataset.baseUrl || '';
+
 /**
  * Handles switching between admin tabs.
  */
@@ -63,7 +66,7 @@ async function handleDeleteClick(event) {
 
     if (confirm(`Are you sure you want to delete "${bookTitle}"?`)) {
         try {
-            const response = await fetch(`/admin/delete_book/${bookId}`, { method: 'DELETE' });
+            const response = await fetch(`${BASE_URL}/admin/delete_book/${bookId}`, { method: 'DELETE' });
             const result = await response.json();
 
             if (response.ok) {
@@ -89,7 +92,7 @@ async function handleSaveOrder() {
     const messageEl = document.getElementById('order-message');
 
     try {
-        const response = await fetch('/admin/update_order', {
+        const response = await fetch(`${BASE_URL}/admin/update_order`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ order }),
@@ -120,7 +123,7 @@ async function handleSettingsSubmit(event) {
     const messageEl = document.getElementById('settings-message');
 
     try {
-        const response = await fetch('/admin/update_settings', {
+        const response = await fetch(`${BASE_URL}/admin/update_settings`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(data),
@@ -1,10 +1,13 @@
+// Prefix for API calls; set to /e/<election_id> when voting in a specific election.
+const BASE_URL = document.body.dataset.baseUrl || '';
+
 /**
  * Fetches the latest vote counts from the server and updates the UI.
  * This is specific to the plurality voting system.
  */
 async function updateVoteCounts() {
     try {
-        const response = await fetch('/results');
+        const response = await fetch(`${BASE_URL}/results`);
         if (!response.ok) throw new Error('Failed to fetch results');
         
         const results = await response.json();
@@ -18,6 +21,15 @@ async function updateVoteCounts() {
     }
 }
 
+/**
+ * Returns the voter code typed on the page, or null if the election doesn't use codes.
+ */
+function getVoterCode() {
+    const input = document.getElementById('voter-code');
+    const code = input ? input.value.trim() : '';
+    return code || null;
+}
+
 /**
  * A global variable to hold the confirmation callback function.
  */
@@ -64,14 +76,20 @@ async function handleVoteClick(event) {
     // Show the modal and pass the actual vote-casting logic as the callback
     showConfirmationModal('Confirm Your Vote', bodyHtml, async () => {
         try {
-            const response = await fetch(`/vote/${bookId}`, { method: 'POST' });
+            const response = await fetch(`${BASE_URL}/vote/${bookId}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ voter_code: getVoterCode() })
+            });
             if (response.ok) {
                 console.log(`Voted for ${bookId}`);
                 updateVoteCounts();
                 hideModal();
             } else {
+                const result = await response.json().catch(() => ({}));
                 console.error('Failed to submit vote.');
-                alert('Failed to submit vote.');
+                alert(result.message || 'Failed to submit vote.');
+                hideModal();
             }
         } catch (error) {
             console.error('Error submitting vote:', error);
@@ -104,10 +122,10 @@ async function handleBallotSubmit() {
         voteMessage.className = 'form-message';
 
         try {
-            const response = await fetch('/vote', {
+            const response = await fetch(`${BASE_URL}/vote`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ ballot: ballot })
+                body: JSON.stringify({ ballot: ballot, voter_code: getVoterCode() })
             });
             const result = await response.json();
 
@@ -228,10 +246,10 @@ async function handleCumulativeBallotSubmit(event, pointsPerVoter) {
         voteMessage.className = 'form-message';
 
         try {
-            const response = await fetch('/vote', {
+            const response = await fetch(`${BASE_URL}/vote`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ ballot })
+                body: JSON.stringify({ ballot, voter_code: getVoterCode() })
             });
             const result = await response.json();
 
@@ -319,7 +337,7 @@ export function initVotePage() {
     // Initialize shared logic
     if (exportButton) {
         exportButton.addEventListener('click', () => {
-            window.location.href = '/export';
+            window.location.href = `${BASE_URL}/export`;
         });
     }
 